@@ -16,6 +16,21 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _default_pdf_workers() -> int:
+    """
+    Default number of PDF extraction worker processes.
+
+    Counts only the CPUs this process may run on (not every CPU on
+    the host) and stays small, since each worker is a full Python process.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity is not available on macOS/Windows
+        cpus = os.cpu_count() or 1
+    return min(4, cpus)
+
+
 class Settings:
     """
     Application settings loaded from environment variables.
@@ -33,7 +48,14 @@ class Settings:
 
     # Document Settings
     MAX_FILE_SIZE_MB: int = 10  # Maximum upload size in MB
-    ALLOWED_EXTENSIONS: list = [".pdf"]
+    MAX_FILE_SIZE_BYTES: int = MAX_FILE_SIZE_MB * 1024 * 1024  # Same limit, precomputed in bytes
+    ALLOWED_EXTENSIONS: frozenset = frozenset({".pdf"})
+
+    # Worker processes for extracting large PDFs in parallel (1 = no workers)
+    PDF_EXTRACT_WORKERS: int = max(1, int(os.getenv("PDF_EXTRACT_WORKERS", _default_pdf_workers())))
+    # Start those workers at startup instead of on the first large upload
+    # (costs memory for processes that may never be used)
+    PDF_PREWARM_WORKERS: bool = os.getenv("PDF_PREWARM_WORKERS", "False").lower() == "true"
 
     # Application Settings
     APP_NAME: str = "AI Document Q&A Service"
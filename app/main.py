@@ -14,14 +14,55 @@ To run the application:
 The "--reload" flag enables auto-restart on code changes (dev only).
 """
 
-from datetime import datetime
+import json
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.routes.documents import router as documents_router
 from app.models.schemas import HealthCheckResponse
+from app.services.ai_service import ai_service
+from app.services.pdf_service import pdf_service
+
+
+# ============ Lifespan (Startup/Shutdown) ============
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Runs once when the application starts (before yield)
+    and once when it shuts down (after yield).
+
+    Good place for:
+    - Initializing connections
+    - Validating configuration
+    - Logging startup info
+    """
+    print(f"\n{'='*50}")
+    print(f" {settings.APP_NAME} v{settings.APP_VERSION}")
+    print(f"{'='*50}")
+    print(f" API Documentation: http://localhost:8000/docs")
+    print(f" Health Check: http://localhost:8000/health")
+    print(f"{'='*50}\n")
+
+    # Warn if API key is not set
+    if not ai_service.validate_api_key():
+        print(" WARNING: GROQ_API_KEY is not set!")
+        print(" The /ask endpoint will not work without it.")
+        print(" Get your FREE key at: https://console.groq.com/keys")
+        print(" Then add it to your .env file.\n")
+
+    # Prewarm services so the first user request doesn't pay setup costs
+    _ = ai_service.client  # Creates the Groq client (lazy property)
+    pdf_service.warm_up()  # Loads the PDF engine and starts extraction workers
+
+    yield
+
+    # Shutdown: stop the PDF extraction worker processes
+    pdf_service.shutdown()
 
 
 # Create FastAPI application instance
@@ -42,7 +83,8 @@ app = FastAPI(
     """,
     version=settings.APP_VERSION,
     docs_url="/docs",  # Swagger UI
-    redoc_url="/redoc"  # ReDoc UI
+    redoc_url="/redoc",  # ReDoc UI
+    lifespan=lifespan
 )
 
 
@@ -86,6 +128,30 @@ async def global_exception_handler(request: Request, exc: Exception):
 app.include_router(documents_router, tags=["Documents"])
 
 
+# ============ Health Check Body ============
+
+# Everything in the /health response except the timestamp is fixed,
+# so it is serialized once here instead of on every call
+_HEALTH_PREFIX = (
+    '{"status":"healthy","version":%s,"timestamp":"' % json.dumps(settings.APP_VERSION)
+).encode("utf-8")
+_HEALTH_SUFFIX = b'"}'
+
+# Last formatted timestamp, reused until the second changes
+_last_timestamp_second = -1
+_last_timestamp_bytes = b""
+
+
+def _now_iso_bytes() -> bytes:
+    """Current UTC time as ISO 8601 bytes (e.g. b"2026-01-14T12:00:00Z")."""
+    global _last_timestamp_second, _last_timestamp_bytes
+    now = int(time.time())
+    if now != _last_timestamp_second:
+        _last_timestamp_bytes = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)).encode("ascii")
+        _last_timestamp_second = now
+    return _last_timestamp_bytes
+
+
 # ============ Root Endpoints ============
 
 @app.get("/", tags=["Health"])
@@ -102,6 +168,7 @@ async def root():
         "endpoints": {
             "upload": "POST /documents",
             "ask": "POST /ask",
+            "ask_stream": "POST /ask/stream",
             "health": "GET /health"
         }
     }
@@ -114,36 +181,11 @@ async def health_check():
 
     Used by monitoring tools and load balancers to verify
     the service is running.
-    """
-    return HealthCheckResponse(
-        status="healthy",
-        version=settings.APP_VERSION,
-        timestamp=datetime.utcnow()
-    )
-
 
-# ============ Startup Event ============
-
-@app.on_event("startup")
-async def startup_event():
-    """
-    Called when the application starts.
-
-    Good place for:
-    - Initializing connections
-    - Validating configuration
-    - Logging startup info
+    Called very often, so it returns pre-serialized JSON bytes
+    directly. The response_model above is kept for the API docs.
     """
-    print(f"\n{'='*50}")
-    print(f" {settings.APP_NAME} v{settings.APP_VERSION}")
-    print(f"{'='*50}")
-    print(f" API Documentation: http://localhost:8000/docs")
-    print(f" Health Check: http://localhost:8000/health")
-    print(f"{'='*50}\n")
-
-    # Warn if API key is not set
-    if not settings.GROQ_API_KEY or settings.GROQ_API_KEY == "your_groq_api_key_here":
-        print(" WARNING: GROQ_API_KEY is not set!")
-        print(" The /ask endpoint will not work without it.")
-        print(" Get your FREE key at: https://console.groq.com/keys")
-        print(" Then add it to your .env file.\n")
+    return Response(
+        content=_HEALTH_PREFIX + _now_iso_bytes() + _HEALTH_SUFFIX,
+        media_type="application/json"
+    )
@@ -10,7 +10,7 @@ Pydantic is a data validation library that:
 These schemas define the SHAPE of data going in and out of your API.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import Optional
 from datetime import datetime
 
@@ -80,3 +80,11 @@ class HealthCheckResponse(BaseModel):
     status: str = Field(description="Service status")
     version: str = Field(description="API version")
     timestamp: datetime = Field(description="Current server time")
+
+
+# ============ Prebuilt Serializers ============
+
+# Built once at import and reused by the routes to turn response
+# models straight into JSON bytes (no second validation pass)
+DOC_UPLOAD_ADAPTER = TypeAdapter(DocumentUploadResponse)
+ASK_QUESTION_ADAPTER = TypeAdapter(AskQuestionResponse)
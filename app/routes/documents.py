@@ -4,6 +4,7 @@ Document Routes - API Endpoints
 This module defines the HTTP endpoints:
 - POST /documents - Upload a PDF document
 - POST /ask - Ask a question about the document
+- POST /ask/stream - Same as /ask, but streams the answer as plain text
 
 FastAPI uses Python type hints and Pydantic models to:
 1. Validate request data automatically
@@ -11,14 +12,19 @@ FastAPI uses Python type hints and Pydantic models to:
 3. Provide editor autocomplete
 """
 
+import asyncio
+import hashlib
+
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response, StreamingResponse
 
 from app.models.schemas import (
     AskQuestionRequest,
     AskQuestionResponse,
     DocumentUploadResponse,
-    ErrorResponse
+    ErrorResponse,
+    DOC_UPLOAD_ADAPTER,
+    ASK_QUESTION_ADAPTER
 )
 from app.services.pdf_service import pdf_service
 from app.services.storage_service import storage_service
@@ -29,12 +35,72 @@ from app.config import settings
 # APIRouter is like a "mini FastAPI app" that groups related endpoints
 router = APIRouter()
 
+# FastAPI spools uploads to a temporary file before the handler runs.
+# We copy it into memory in chunks of this size so oversized files are
+# rejected without ever holding them fully in memory.
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+def _get_document_for_question():
+    """
+    Shared checks for the /ask endpoints.
+
+    Returns:
+        The current document
+
+    Raises:
+        HTTPException 500: API key is not configured
+        HTTPException 400: No document has been uploaded
+    """
+    # Check if API key is configured
+    if not ai_service.validate_api_key():
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "error": "CONFIGURATION_ERROR",
+                "message": "OpenAI API key is not configured. Please set OPENAI_API_KEY environment variable."
+            }
+        )
+
+    # Get current document
+    document = storage_service.get_current_document()
+
+    if not document:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "error": "NO_DOCUMENT",
+                "message": "No document has been uploaded. Please upload a PDF document first using POST /documents"
+            }
+        )
+
+    return document
+
+
+def _file_too_large_error() -> HTTPException:
+    """Build the 413 error returned for oversized uploads."""
+    return HTTPException(
+        status_code=413,
+        detail={
+            "success": False,
+            "error": "FILE_TOO_LARGE",
+            "message": f"File too large. Maximum size is {settings.MAX_FILE_SIZE_MB}MB"
+        }
+    )
+
 
 @router.post(
     "/documents",
-    response_model=DocumentUploadResponse,
+    # Serialized in the handler with a prebuilt adapter, so FastAPI
+    # doesn't validate the return value again; the model is still
+    # listed under responses for the API docs
+    response_model=None,
     responses={
+        200: {"model": DocumentUploadResponse, "description": "Document processed"},
         400: {"model": ErrorResponse, "description": "Invalid file"},
+        413: {"model": ErrorResponse, "description": "File too large"},
         500: {"model": ErrorResponse, "description": "Server error"}
     },
     summary="Upload a PDF document",
@@ -49,6 +115,10 @@ async def upload_document(file: UploadFile = File(...)):
     2. Extracts text from the PDF
     3. Stores the text for later Q&A
 
+    Re-uploading an identical file reuses the stored document
+    (same document ID) instead of extracting it again. The response
+    still reports the filename of the current upload.
+
     Args:
         file: The uploaded PDF file (multipart form data)
 
@@ -57,39 +127,71 @@ async def upload_document(file: UploadFile = File(...)):
 
     Raises:
         HTTPException 400: Invalid file type, empty file, or extraction failed
+        HTTPException 413: File exceeds the maximum upload size
         HTTPException 500: Server error during processing
     """
+    max_size_bytes = settings.MAX_FILE_SIZE_BYTES
+
     try:
-        # Step 1: Read file content
-        content = await file.read()
+        # Step 1: Read file content in chunks, stopping as soon as it's too big
+        buffer = bytearray()
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            buffer.extend(chunk)
+            if len(buffer) > max_size_bytes:
+                raise _file_too_large_error()
+        content = bytes(buffer)
+        del buffer
 
         # Step 2: Validate file (type and size)
         pdf_service.validate_file(
             filename=file.filename or "unknown.pdf",
-            file_size=len(content),
-            max_size_mb=settings.MAX_FILE_SIZE_MB
+            file_size=len(content)
         )
 
-        # Step 3: Extract text from PDF
-        extracted_text, page_count = pdf_service.extract_text(content)
+        # Step 3: Reuse the stored document if this exact file was uploaded before
+        content_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+        document = storage_service.get_by_hash(content_hash)
 
-        # Step 4: Store document
-        document = storage_service.store_document(
-            filename=file.filename or "unknown.pdf",
-            content=extracted_text,
-            page_count=page_count
-        )
+        if document:
+            storage_service.set_current_document(document)
+        else:
+            # Step 4: Extract text from PDF
+            # PDF parsing is CPU-bound, so run it in a worker thread to keep
+            # the event loop free to serve other requests meanwhile
+            loop = asyncio.get_running_loop()
+            extracted_text, page_count = await loop.run_in_executor(
+                None, pdf_service.extract_text, content
+            )
+
+            # Step 5: Store document
+            document = storage_service.store_document(
+                filename=file.filename or "unknown.pdf",
+                content=extracted_text,
+                page_count=page_count,
+                content_hash=content_hash
+            )
 
-        # Step 5: Return success response
-        return DocumentUploadResponse(
+        # Step 6: Return success response
+        # Validated once when built, then serialized straight to JSON
+        # bytes by pydantic-core through the prebuilt adapter
+        response = DocumentUploadResponse(
             success=True,
             message="Document uploaded and processed successfully",
             document_id=document.id,
-            filename=document.filename,
+            # Name of this upload, even if an identical file was stored
+            # earlier under a different name
+            filename=file.filename or "unknown.pdf",
             page_count=document.page_count,
             character_count=document.character_count
         )
+        return Response(
+            content=DOC_UPLOAD_ADAPTER.dump_json(response),
+            media_type="application/json"
+        )
 
+    except HTTPException:
+        # Re-raise HTTP exceptions as-is
+        raise
     except ValueError as e:
         # Validation errors (bad file type, empty file, etc.)
         raise HTTPException(
@@ -114,8 +216,10 @@ async def upload_document(file: UploadFile = File(...)):
 
 @router.post(
     "/ask",
-    response_model=AskQuestionResponse,
+    # Serialized in the handler with a prebuilt adapter (see /documents)
+    response_model=None,
     responses={
+        200: {"model": AskQuestionResponse, "description": "Grounded answer"},
         400: {"model": ErrorResponse, "description": "No document or invalid question"},
         500: {"model": ErrorResponse, "description": "AI service error"}
     },
@@ -142,43 +246,104 @@ async def ask_question(request: AskQuestionRequest):
         HTTPException 500: AI service error
     """
     try:
-        # Step 1: Check if API key is configured
-        if not ai_service.validate_api_key():
-            raise HTTPException(
-                status_code=500,
-                detail={
-                    "success": False,
-                    "error": "CONFIGURATION_ERROR",
-                    "message": "OpenAI API key is not configured. Please set OPENAI_API_KEY environment variable."
-                }
-            )
-
-        # Step 2: Get current document
-        document = storage_service.get_current_document()
-
-        if not document:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "success": False,
-                    "error": "NO_DOCUMENT",
-                    "message": "No document has been uploaded. Please upload a PDF document first using POST /documents"
-                }
-            )
+        # Step 1 & 2: Check configuration and get current document
+        document = _get_document_for_question()
 
         # Step 3: Get AI answer
-        answer = ai_service.answer_question(
-            document_content=document.content,
+        answer = await ai_service.answer_question(
+            document=document,
             question=request.question
         )
 
         # Step 4: Return response
-        return AskQuestionResponse(
+        # Validated once when built, then serialized straight to JSON
+        # bytes by pydantic-core through the prebuilt adapter
+        response = AskQuestionResponse(
             success=True,
             question=request.question,
             answer=answer,
             document_id=document.id
         )
+        return Response(
+            content=ASK_QUESTION_ADAPTER.dump_json(response),
+            media_type="application/json"
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions as-is
+        raise
+    except ValueError as e:
+        # Validation errors from AI service
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "error": "VALIDATION_ERROR",
+                "message": str(e)
+            }
+        )
+    except Exception as e:
+        # AI service errors
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "error": "AI_SERVICE_ERROR",
+                "message": str(e)
+            }
+        )
+
+
+@router.post(
+    "/ask/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/plain": {}}, "description": "Answer text, streamed as it is generated"},
+        400: {"model": ErrorResponse, "description": "No document or invalid question"},
+        500: {"model": ErrorResponse, "description": "AI service error"}
+    },
+    summary="Ask a question and stream the answer",
+    description="Same as POST /ask, but the answer is streamed back as plain text while the AI generates it."
+)
+async def ask_question_stream(request: AskQuestionRequest):
+    """
+    Ask a question and stream the answer as it is generated.
+
+    The first piece of the answer is fetched before the response
+    starts, so validation and API errors still return a normal JSON
+    error response. Errors after that point end the stream early.
+
+    Args:
+        request: AskQuestionRequest containing the question
+
+    Returns:
+        StreamingResponse with the answer as plain text
+
+    Raises:
+        HTTPException 400: No document uploaded or invalid question
+        HTTPException 500: AI service error
+    """
+    try:
+        # Step 1 & 2: Check configuration and get current document
+        document = _get_document_for_question()
+
+        # Step 3: Start the AI answer and wait for its first piece
+        stream = ai_service.answer_question_stream(
+            document=document,
+            question=request.question
+        )
+        try:
+            first_piece = await stream.__anext__()
+        except StopAsyncIteration:
+            first_piece = ""
+
+        # Step 4: Stream the rest of the answer to the client
+        async def answer_pieces():
+            yield first_piece
+            async for piece in stream:
+                yield piece
+
+        return StreamingResponse(answer_pieces(), media_type="text/plain; charset=utf-8")
 
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -16,8 +16,26 @@ WHY GROQ?
 - Easy to set up
 """
 
-from groq import Groq
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Optional
+
+from groq import AsyncGroq
 from app.config import settings
+from app.services.retrieval_service import retrieval_service
+
+if TYPE_CHECKING:
+    # Only needed for type hints - storage_service imports this module
+    from app.services.storage_service import Document
+
+
+# Maximum number of cached answers kept per document
+MAX_CACHED_ANSWERS_PER_DOCUMENT = 1024
+
+# Settings are loaded once at startup, so the key check only needs doing once
+_API_KEY_VALID: bool = bool(settings.GROQ_API_KEY and
+                            settings.GROQ_API_KEY.strip() and
+                            settings.GROQ_API_KEY != "your_groq_api_key_here")
 
 
 class AIService:
@@ -28,24 +46,73 @@ class AIService:
     engineering to ensure grounded responses.
     """
 
+    # ============ Prompts (this is where PROMPT ENGINEERING happens) ============
+    # Built once at import time rather than on every question.
+
+    # SYSTEM PROMPT - This is the most important part!
+    # Never changes, so the whole message dict is shared between requests.
+    _SYSTEM_MESSAGE = {
+        "role": "system",
+        "content": """You are a precise document analysis assistant. Your ONLY job is to answer questions based strictly on the provided document content.
+
+CRITICAL RULES YOU MUST FOLLOW:
+1. ONLY use information that is explicitly stated in the document
+2. DO NOT use any external knowledge or make assumptions
+3. DO NOT infer or guess information that isn't clearly written
+4. If the document does not contain the answer, you MUST respond with exactly: "The document does not contain this information."
+5. Quote or paraphrase directly from the document when possible
+6. Be concise and accurate
+
+Remember: It's better to say you don't know than to make up information."""
+    }
+
+    # USER PROMPT - Contains the document and question (filled via str.format)
+    _USER_PROMPT_TEMPLATE = """DOCUMENT CONTENT:
+---
+{document_content}
+---
+
+QUESTION: {question}
+
+Based ONLY on the document content above, please answer the question. If the answer cannot be found in the document, respond with "The document does not contain this information." """
+
     def __init__(self):
-        """Initialize Groq client."""
+        """Initialize Groq client and answer cache."""
         self._client = None
         self.model_name = settings.GROQ_MODEL
 
+        # Cache of previous answers: {document_id: {question_key: answer}}
+        # Grouped by document so a deleted document can be evicted at once.
+        # Each inner OrderedDict is kept in least-recently-used order.
+        self._answer_cache: Dict[str, "OrderedDict[str, str]"] = {}
+
     @property
     def client(self):
-        """Lazy initialization of Groq client."""
+        """
+        Lazy initialization of Groq client.
+
+        Uses the async client so API calls don't block the event loop.
+        """
         if self._client is None and settings.GROQ_API_KEY:
-            self._client = Groq(api_key=settings.GROQ_API_KEY)
+            self._client = AsyncGroq(api_key=settings.GROQ_API_KEY)
         return self._client
 
-    def answer_question(self, document_content: str, question: str) -> str:
+    async def answer_question(
+        self,
+        document: "Document",
+        question: str
+    ) -> str:
         """
         Answer a question based ONLY on the provided document content.
 
+        Answers are cached per document, so asking the same question
+        again (ignoring case and surrounding whitespace) skips the API call.
+
+        Long documents are not sent in full: only the chunks most
+        relevant to the question are included in the prompt.
+
         Args:
-            document_content: The full text content of the document
+            document: The stored document (content, chunks and index)
             question: User's question about the document
 
         Returns:
@@ -55,22 +122,23 @@ class AIService:
             Exception: If API call fails
         """
         # Validate inputs
-        if not document_content or not document_content.strip():
-            raise ValueError("Document content is empty")
+        self._validate_inputs(document, question)
 
-        if not question or not question.strip():
-            raise ValueError("Question is empty")
+        # Return cached answer if this question was already asked
+        question_key = self._question_key(question)
+        cached_answer = self._get_cached_answer(document.id, question_key)
+        if cached_answer is not None:
+            return cached_answer
 
-        # Check if question is too long (prevent issues)
-        if len(question) > 1000:
-            raise ValueError("Question is too long. Maximum 1000 characters allowed.")
+        # Keep only the parts of the document relevant to the question
+        context = retrieval_service.select_context(document, question)
 
         # Build the messages
-        messages = self._build_messages(document_content, question)
+        messages = self._build_messages(context, question)
 
         try:
             # Make API call to Groq
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
                 max_tokens=1024,
@@ -79,48 +147,165 @@ class AIService:
 
             # Extract the answer
             answer = response.choices[0].message.content.strip()
-            return answer
 
         except Exception as e:
             # Handle API errors - show actual error for debugging
             error_message = str(e)
             raise Exception(f"Groq API error: {error_message}")
 
-    def _build_messages(self, document_content: str, question: str) -> list:
+        self._cache_answer(document.id, question_key, answer)
+        return answer
+
+    async def answer_question_stream(
+        self,
+        document: "Document",
+        question: str
+    ) -> AsyncIterator[str]:
         """
-        Build the message list for Groq Chat API.
+        Same as answer_question, but yields the answer piece by piece
+        as Groq generates it, so clients see the first words sooner.
 
-        This is where PROMPT ENGINEERING happens.
+        A cached answer is yielded in one piece. The full streamed
+        answer is cached once the stream finishes.
 
-        Returns:
-            List of message dictionaries for the API
+        Args:
+            document: The stored document (content, chunks and index)
+            question: User's question about the document
+
+        Yields:
+            Pieces of the AI-generated answer
+
+        Raises:
+            Exception: If API call fails
         """
-        # SYSTEM PROMPT - This is the most important part!
-        system_prompt = """You are a precise document analysis assistant. Your ONLY job is to answer questions based strictly on the provided document content.
+        # Validate inputs
+        self._validate_inputs(document, question)
 
-CRITICAL RULES YOU MUST FOLLOW:
-1. ONLY use information that is explicitly stated in the document
-2. DO NOT use any external knowledge or make assumptions
-3. DO NOT infer or guess information that isn't clearly written
-4. If the document does not contain the answer, you MUST respond with exactly: "The document does not contain this information."
-5. Quote or paraphrase directly from the document when possible
-6. Be concise and accurate
+        # Return cached answer if this question was already asked
+        question_key = self._question_key(question)
+        cached_answer = self._get_cached_answer(document.id, question_key)
+        if cached_answer is not None:
+            yield cached_answer
+            return
 
-Remember: It's better to say you don't know than to make up information."""
+        # Keep only the parts of the document relevant to the question
+        context = retrieval_service.select_context(document, question)
 
-        # USER PROMPT - Contains the document and question
-        user_prompt = f"""DOCUMENT CONTENT:
----
-{document_content}
----
+        # Build the messages
+        messages = self._build_messages(context, question)
 
-QUESTION: {question}
+        parts = []
+        try:
+            # Make streaming API call to Groq
+            stream = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                max_tokens=1024,
+                temperature=0.1,  # Low = focused, less creative (prevents hallucination)
+                stream=True,
+            )
 
-Based ONLY on the document content above, please answer the question. If the answer cannot be found in the document, respond with "The document does not contain this information." """
+            # Stream the same text answer_question() would return:
+            # drop leading whitespace, and hold back trailing whitespace
+            # until more text follows it (so the end is never sent)
+            pending = ""
+            async for chunk in stream:
+                piece = chunk.choices[0].delta.content if chunk.choices else None
+                if piece and not parts:
+                    piece = piece.lstrip()
+                if not piece:
+                    continue
+                text = piece.rstrip()
+                if not text:
+                    pending += piece
+                    continue
+                parts.append(pending + text)
+                pending = piece[len(text):]
+                yield parts[-1]
+
+        except Exception as e:
+            # Handle API errors - show actual error for debugging
+            error_message = str(e)
+            raise Exception(f"Groq API error: {error_message}")
+
+        # Cache exactly the text that was sent
+        answer = "".join(parts)
+        if answer:
+            self._cache_answer(document.id, question_key, answer)
+
+    @staticmethod
+    def _validate_inputs(document: "Document", question: str) -> None:
+        """
+        Check the document and question before calling the API.
+
+        Raises:
+            ValueError: If the document is empty or the question is invalid
+        """
+        # Extracted text is already stripped at upload, so an emptiness
+        # check is enough (no need to copy the whole document)
+        if not document.content:
+            raise ValueError("Document content is empty")
+
+        if not question or not question.strip():
+            raise ValueError("Question is empty")
+
+        # Check if question is too long (prevent issues)
+        if len(question) > 1000:
+            raise ValueError("Question is too long. Maximum 1000 characters allowed.")
+
+    @staticmethod
+    def _question_key(question: str) -> str:
+        """Normalize a question and hash it into a compact cache key."""
+        return hashlib.sha1(question.strip().lower().encode("utf-8")).hexdigest()
+
+    def _get_cached_answer(self, document_id: str, question_key: str) -> Optional[str]:
+        """Look up a cached answer, marking it as recently used."""
+        document_cache = self._answer_cache.get(document_id)
+        if document_cache is None or question_key not in document_cache:
+            return None
+        document_cache.move_to_end(question_key)
+        return document_cache[question_key]
+
+    def _cache_answer(self, document_id: str, question_key: str, answer: str) -> None:
+        """Store an answer, evicting the least recently used one if full."""
+        document_cache = self._answer_cache.setdefault(document_id, OrderedDict())
+        document_cache[question_key] = answer
+        document_cache.move_to_end(question_key)
+        if len(document_cache) > MAX_CACHED_ANSWERS_PER_DOCUMENT:
+            document_cache.popitem(last=False)
 
+    def clear_cache(self, document_id: Optional[str] = None) -> None:
+        """
+        Remove cached answers.
+
+        Args:
+            document_id: Only clear answers for this document.
+                If None, clear the whole cache.
+        """
+        if document_id is None:
+            self._answer_cache.clear()
+        else:
+            self._answer_cache.pop(document_id, None)
+
+    def _build_messages(self, document_content: str, question: str) -> list:
+        """
+        Build the message list for Groq Chat API.
+
+        The prompts themselves are defined once at class level;
+        only the user prompt needs filling in per question.
+
+        Returns:
+            List of message dictionaries for the API
+        """
         return [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
+            self._SYSTEM_MESSAGE,
+            {
+                "role": "user",
+                "content": self._USER_PROMPT_TEMPLATE.format(
+                    document_content=document_content,
+                    question=question
+                )
+            }
         ]
 
     def validate_api_key(self) -> bool:
@@ -130,9 +315,7 @@ Based ONLY on the document content above, please answer the question. If the ans
         Returns:
             True if API key exists, False otherwise
         """
-        return bool(settings.GROQ_API_KEY and
-                    settings.GROQ_API_KEY.strip() and
-                    settings.GROQ_API_KEY != "your_groq_api_key_here")
+        return _API_KEY_VALID
 
 
 # Create singleton instance
@@ -12,9 +12,70 @@ Why separate this into its own service?
 - Reusability: Can use this service elsewhere if needed
 """
 
-import io
-from PyPDF2 import PdfReader
-from typing import Tuple
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import pypdfium2 as pdfium
+from typing import List, Optional, Tuple
+
+from app.config import settings
+
+
+# Minimum pages handed to each worker process. Every worker receives
+# and opens the whole PDF, so a batch must be big enough to be worth it.
+# PDFs need at least twice this many pages to be extracted in parallel.
+MIN_PAGES_PER_WORKER = 16
+
+# PDFium is not thread-safe, even across separate documents. Every
+# PDFium call made in this process (extraction runs on the event loop's
+# thread pool) must hold this lock. Worker processes don't need it.
+_PDFIUM_LOCK = threading.Lock()
+
+# Separator placed before each page's text; bound method of a constant
+# template so the format string isn't rebuilt for every page
+_PAGE_SEPARATOR = "\n--- Page {} ---\n".format
+
+
+def _extract_pages(pdf: pdfium.PdfDocument, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of pages [start, stop) from an open PDF.
+
+    Returns:
+        List with one text string per page, in page order
+    """
+    texts = []
+    for page_num in range(start, stop):
+        page = pdf[page_num]
+        textpage = page.get_textpage()
+        texts.append(textpage.get_text_range())
+        # PDFium handles are native memory - release them eagerly
+        textpage.close()
+        page.close()
+    return texts
+
+
+def _extract_page_range(file_content: bytes, start: int, stop: int) -> List[str]:
+    """
+    Worker-process entry point: open the PDF and extract pages [start, stop).
+
+    Each worker opens its own document because PDFium is not
+    thread-safe and its handles can't be shared across processes.
+    """
+    pdf = pdfium.PdfDocument(file_content)
+    try:
+        return _extract_pages(pdf, start, stop)
+    finally:
+        pdf.close()
+
+
+def _warm_worker() -> None:
+    """
+    No-op task used to start worker processes ahead of time.
+
+    Running it makes each worker import this module (and PDFium).
+    """
 
 
 class PDFService:
@@ -22,6 +83,96 @@ class PDFService:
     Service for handling PDF operations.
     """
 
+    # Allowed file extensions, lowercased once for fast lookups
+    _ALLOWED_EXTS = frozenset(ext.lower() for ext in settings.ALLOWED_EXTENSIONS)
+
+    def __init__(self):
+        """Initialize service (worker pool is created on first use)."""
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Uploads run on several threads, so pool creation needs a lock
+        # or two concurrent large uploads could each create a pool
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """
+        Lazy initialization of the page extraction process pool.
+
+        Uses "spawn" so workers don't fork a copy of the
+        (multi-threaded) server process.
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=settings.PDF_EXTRACT_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def _discard_executor(self, broken: ProcessPoolExecutor) -> None:
+        """
+        Drop a pool whose worker died (e.g. crashed on a malformed PDF
+        or was killed for using too much memory). A broken pool rejects
+        all later work, so the next large upload gets a fresh one.
+        """
+        with self._executor_lock:
+            # Another thread may already have replaced it
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False)
+
+    def _extract_in_pool(self, file_content: bytes, starts: range, stops: List[int]) -> List[str]:
+        """
+        Extract page batches in worker processes.
+
+        If a worker dies, the broken pool is discarded and the work is
+        retried once on a new pool. It is not retried in-process: a PDF
+        that crashes PDFium would then take the whole server down.
+
+        Raises:
+            ValueError: If workers die again on the retry
+        """
+        for _ in range(2):
+            executor = self.executor
+            try:
+                page_texts: List[str] = []
+                for batch in executor.map(
+                    _extract_page_range,
+                    [file_content] * len(starts), starts, stops
+                ):
+                    page_texts.extend(batch)
+                return page_texts
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+
+        raise ValueError("Could not read PDF: the file crashed the PDF extractor")
+
+    def shutdown(self) -> None:
+        """Stop the page extraction worker processes, if started."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def warm_up(self) -> None:
+        """
+        Do the one-time setup at startup instead of during the first upload:
+        exercise PDFium once in this process.
+
+        The extraction worker processes are only started here when
+        PDF_PREWARM_WORKERS is set - otherwise they are spawned by the
+        first large upload, so small deployments don't pay for idle workers.
+        """
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument.new()
+            pdf.close()
+
+        if settings.PDF_PREWARM_WORKERS and settings.PDF_EXTRACT_WORKERS >= 2:
+            # Submitting one task per worker at once makes the pool
+            # spawn all of its workers, not just the first one
+            wait([self.executor.submit(_warm_worker) for _ in range(settings.PDF_EXTRACT_WORKERS)])
+
     def extract_text(self, file_content: bytes) -> Tuple[str, int]:
         """
         Extract text content from a PDF file.
@@ -37,42 +188,65 @@ class PDFService:
             Exception: For other PDF processing errors
 
         How it works:
-        1. Create a BytesIO object from the raw bytes (makes it file-like)
-        2. Use PdfReader to parse the PDF structure
-        3. Loop through each page and extract text
-        4. Combine all text and return with page count
+        1. Open the raw bytes with PDFium (a fast native C++ PDF engine)
+        2. Extract text page by page - split across worker processes
+           for large PDFs
+        3. Join all text once and return with page count
         """
         try:
-            # BytesIO allows us to treat bytes as a file object
-            # PdfReader expects a file-like object, not raw bytes
-            pdf_file = io.BytesIO(file_content)
+            # pypdfium2 accepts raw bytes directly - no BytesIO wrapper needed
+            # Serialized: concurrent uploads run on different threads
+            with _PDFIUM_LOCK:
+                pdf = pdfium.PdfDocument(file_content)
+                try:
+                    # Get number of pages
+                    page_count = len(pdf)
+
+                    if page_count == 0:
+                        raise ValueError("PDF file contains no pages")
 
-            # Create PDF reader object
-            reader = PdfReader(pdf_file)
+                    # Use only as many workers as have enough pages to do
+                    worker_count = min(
+                        settings.PDF_EXTRACT_WORKERS,
+                        page_count // MIN_PAGES_PER_WORKER
+                    )
 
-            # Get number of pages
-            page_count = len(reader.pages)
+                    # Small PDFs: extract directly from the open document
+                    if worker_count < 2:
+                        page_texts = _extract_pages(pdf, 0, page_count)
+                    else:
+                        page_texts = None
+                finally:
+                    pdf.close()
 
-            if page_count == 0:
-                raise ValueError("PDF file contains no pages")
+            if page_texts is None:
+                # Large PDFs: split pages into one contiguous batch per
+                # worker process. executor.map returns results in
+                # submission order, so page order is preserved.
+                batch_size = -(-page_count // worker_count)  # ceil division
+                starts = range(0, page_count, batch_size)
+                stops = [min(start + batch_size, page_count) for start in starts]
+                page_texts = self._extract_in_pool(file_content, starts, stops)
 
-            # Extract text from each page
-            extracted_text = ""
-            for page_num, page in enumerate(reader.pages):
-                page_text = page.extract_text()
+            # Collect pieces in a list and join once at the end -
+            # repeated `+=` on a str copies the whole text every page
+            parts: List[str] = []
+            for page_num, page_text in enumerate(page_texts):
                 if page_text:
                     # Add page separator for clarity
-                    extracted_text += f"\n--- Page {page_num + 1} ---\n"
-                    extracted_text += page_text
+                    parts.append(_PAGE_SEPARATOR(page_num + 1))
+                    parts.append(page_text)
+
+            extracted_text = "".join(parts).strip()
 
             # Check if we got any text
-            if not extracted_text.strip():
+            if not extracted_text:
                 raise ValueError(
                     "Could not extract text from PDF. "
                     "The PDF might be scanned/image-based or empty."
                 )
 
-            return extracted_text.strip(), page_count
+            return extracted_text, page_count
 
         except ValueError:
             # Re-raise ValueError as-is (our custom errors)
@@ -81,29 +255,30 @@ class PDFService:
             # Wrap other errors with more context
             raise Exception(f"Failed to process PDF: {str(e)}")
 
-    def validate_file(self, filename: str, file_size: int, max_size_mb: int = 10) -> None:
+    def validate_file(self, filename: str, file_size: int) -> None:
         """
         Validate that the uploaded file meets requirements.
 
+        The size limit comes from settings.MAX_FILE_SIZE_BYTES.
+
         Args:
             filename: Original filename
             file_size: Size in bytes
-            max_size_mb: Maximum allowed size in megabytes
 
         Raises:
             ValueError: If validation fails
         """
-        # Check file extension
-        if not filename.lower().endswith('.pdf'):
+        # Check file extension (only the extension is lowercased, not the whole name)
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in self._ALLOWED_EXTS:
             raise ValueError(
-                f"Invalid file type. Expected PDF, got: {filename.split('.')[-1] if '.' in filename else 'unknown'}"
+                f"Invalid file type. Expected PDF, got: {extension[1:] or 'unknown'}"
             )
 
         # Check file size
-        max_size_bytes = max_size_mb * 1024 * 1024  # Convert MB to bytes
-        if file_size > max_size_bytes:
+        if file_size > settings.MAX_FILE_SIZE_BYTES:
             raise ValueError(
-                f"File too large. Maximum size is {max_size_mb}MB, "
+                f"File too large. Maximum size is {settings.MAX_FILE_SIZE_MB}MB, "
                 f"got {file_size / (1024 * 1024):.2f}MB"
             )
 
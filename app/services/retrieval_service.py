@@ -0,0 +1,174 @@
+"""
+Retrieval Service - Picks the relevant parts of a document
+
+Sending a whole long document to the AI with every question is slow,
+wastes tokens, and can overflow the model's context window.
+
+This service:
+1. Splits document text into ~500-token chunks (on sentence boundaries)
+2. Builds a BM25 (keyword relevance) index once per document
+3. Ranks chunks against a question using that index
+4. Returns only the best chunks, within a fixed character budget
+
+Short documents that already fit the budget are sent unchanged.
+"""
+
+import re
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from rank_bm25 import BM25Okapi
+
+if TYPE_CHECKING:
+    # Only needed for type hints - storage_service imports this module
+    from app.services.storage_service import Document
+
+
+# Target chunk size in UTF-8 bytes (~500 tokens at ~4 characters per token;
+# bytes equal characters for ASCII text)
+CHUNK_TARGET_BYTES = 2000
+
+# Number of top-ranked chunks sent to the AI
+TOP_K_CHUNKS = 8
+
+# Maximum characters of document content sent to the AI per question
+MAX_CONTEXT_CHARS = 24000
+
+# Sentence boundary: whitespace following ., ! or ?
+# Matched on UTF-8 bytes - these are all ASCII, and ASCII bytes never
+# occur inside a multi-byte character, so spans always decode cleanly
+_SENTENCE_BOUNDARY = re.compile(rb"(?<=[.!?])\s+")
+
+# Word tokens used for BM25 scoring
+_WORD = re.compile(r"\w+")
+
+
+class RetrievalService:
+    """
+    Service for chunking documents and selecting relevant chunks.
+    """
+
+    def split_into_chunks(self, content: bytes, character_count: int) -> List[Tuple[int, int]]:
+        """
+        Split text into chunks of roughly CHUNK_TARGET_BYTES.
+
+        Chunks are (start, end) byte offsets into the stored UTF-8
+        content rather than copies, so the document text is kept in
+        memory only once. They end on sentence boundaries, so a single
+        very long sentence may produce a larger chunk.
+
+        Documents that fit MAX_CONTEXT_CHARS are always sent whole,
+        so they are not chunked at all.
+
+        Args:
+            content: Full document text, UTF-8 encoded
+            character_count: Length of the text in characters
+
+        Returns:
+            List of (start, end) spans, in document order
+            (empty for short documents)
+        """
+        if character_count <= MAX_CONTEXT_CHARS:
+            return []
+
+        # (sentence_end, next_sentence_start) for every sentence
+        boundaries = [(match.start(), match.end()) for match in _SENTENCE_BOUNDARY.finditer(content)]
+        boundaries.append((len(content), len(content)))
+
+        spans: List[Tuple[int, int]] = []
+        chunk_start = 0
+        chunk_end = None  # End of the last sentence added to the current chunk
+        sentence_start = 0
+
+        for sentence_end, next_sentence_start in boundaries:
+            # Close the current chunk if this sentence would make it too big
+            if chunk_end is not None and sentence_end - chunk_start > CHUNK_TARGET_BYTES:
+                spans.append((chunk_start, chunk_end))
+                chunk_start = sentence_start
+            chunk_end = sentence_end
+            sentence_start = next_sentence_start
+
+        spans.append((chunk_start, chunk_end))
+        return spans
+
+    def tokenize(self, text: str) -> List[str]:
+        """Lowercase word tokens used for BM25 ranking."""
+        return _WORD.findall(text.lower())
+
+    def build_index(self, content: bytes, chunks: List[Tuple[int, int]]) -> Optional[BM25Okapi]:
+        """
+        Build the BM25 index for a document's chunks.
+
+        Meant to be called once when the document is stored, so
+        questions reuse the index instead of re-tokenizing every chunk.
+
+        Args:
+            content: Full document text, UTF-8 encoded
+            chunks: The spans returned by split_into_chunks()
+
+        Returns:
+            BM25 index, or None if the document is short enough to be
+            sent whole (no ranking needed)
+        """
+        if not chunks:
+            return None
+        return BM25Okapi([
+            self.tokenize(content[start:end].decode("utf-8")) for start, end in chunks
+        ])
+
+    def select_context(self, document: "Document", question: str) -> str:
+        """
+        Build the document context to send to the AI for a question.
+
+        Args:
+            document: The stored document (content, chunks and index)
+            question: User's question
+
+        Returns:
+            The full content if it fits MAX_CONTEXT_CHARS, otherwise
+            the top-ranked chunks (in document order) within that budget
+        """
+        content = document.content
+        chunks = document.chunks
+        if not chunks:
+            # Short document (never chunked or indexed) - send it whole,
+            # decoding the stored UTF-8 bytes only now
+            return content.decode("utf-8")[:MAX_CONTEXT_CHARS]
+
+        query_tokens = self.tokenize(question)
+        if query_tokens:
+            # Chunked documents always have an index built at upload
+            scores = document.bm25.get_scores(query_tokens)
+            ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+        else:
+            # Nothing to rank on - fall back to the start of the document
+            ranked = list(range(len(chunks)))
+
+        # Take the best chunks that fit the budget
+        # (byte lengths are never less than character lengths, so this
+        # stays within MAX_CONTEXT_CHARS)
+        selected: List[int] = []
+        total_length = 0
+        for chunk_index in ranked[:TOP_K_CHUNKS]:
+            start, end = chunks[chunk_index]
+            chunk_length = end - start
+            if total_length + chunk_length > MAX_CONTEXT_CHARS:
+                continue
+            selected.append(chunk_index)
+            total_length += chunk_length
+
+        if not selected:
+            # Even the best chunk alone is over budget - send a truncated copy
+            start, end = chunks[ranked[0]]
+            return content[start:end].decode("utf-8")[:MAX_CONTEXT_CHARS]
+
+        # Keep document order so the AI sees passages as they were written,
+        # decoding only the selected chunks
+        selected.sort()
+        return "\n...\n".join(
+            content[start:end].decode("utf-8")
+            for start, end in (chunks[chunk_index] for chunk_index in selected)
+        )
+
+
+# Create singleton instance
+retrieval_service = RetrievalService()
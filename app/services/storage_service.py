@@ -17,10 +17,14 @@ Why in-memory for this assignment?
 4. Meets assignment requirements
 """
 
-import uuid
+import secrets
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+from app.services.ai_service import ai_service
+from app.services.retrieval_service import retrieval_service
 
 
 @dataclass
@@ -37,34 +41,44 @@ class Document:
     """
     id: str
     filename: str
-    content: str  # Extracted text content
+    content: bytes  # Extracted text content, UTF-8 encoded (smaller than str for non-ASCII text)
     page_count: int
     character_count: int
     uploaded_at: datetime
+    chunks: List[Tuple[int, int]] = field(default_factory=list)  # (start, end) byte spans of ~500-token pieces of content
+    bm25: Any = None  # Prebuilt BM25 index over chunks (None for short documents)
+    content_hash: Optional[str] = None  # Hash of the uploaded file bytes (for dedup)
 
 
 class StorageService:
     """
     In-memory storage for documents.
 
-    Uses a dictionary with document ID as key.
+    Uses an ordered dictionary with document ID as key,
+    kept in upload order (oldest first).
     Thread-safe for basic operations (Python GIL).
     """
 
     def __init__(self):
         """Initialize empty storage."""
-        # Dictionary to store documents: {document_id: Document}
-        self._documents: Dict[str, Document] = {}
+        # Ordered dictionary to store documents: {document_id: Document}
+        self._documents: "OrderedDict[str, Document]" = OrderedDict()
 
         # Track the "current" document (most recently uploaded)
-        # This simplifies the API - /ask doesn't need document_id
-        self._current_document_id: Optional[str] = None
+        # This simplifies the API - /ask doesn't need document_id.
+        # Holding the object itself saves a lookup on every /ask.
+        self._current_document: Optional[Document] = None
+
+        # Uploaded file hash -> document ID, so re-uploads of the
+        # same file can reuse the stored document
+        self._by_hash: Dict[str, str] = {}
 
     def store_document(
         self,
         filename: str,
         content: str,
-        page_count: int
+        page_count: int,
+        content_hash: Optional[str] = None
     ) -> Document:
         """
         Store a new document and set it as current.
@@ -73,29 +87,43 @@ class StorageService:
             filename: Original filename
             content: Extracted text content
             page_count: Number of pages
+            content_hash: Hash of the raw uploaded file (see get_by_hash)
 
         Returns:
             Document object with generated ID
         """
-        # Generate unique ID using UUID4
-        # UUID4 = random UUID, virtually no chance of collision
-        document_id = str(uuid.uuid4())
+        # Generate unique ID: 128 random bits as 32 hex characters
+        # (same randomness as a UUID4, built as a str in one step)
+        document_id = secrets.token_hex(16)
+
+        # Keep a single UTF-8 copy of the text; chunks only point into it
+        encoded_content = content.encode("utf-8", errors="replace")
+        character_count = len(content)
+
+        # Chunk and index once at upload so every /ask can
+        # pick relevant parts without redoing this work
+        chunks = retrieval_service.split_into_chunks(encoded_content, character_count)
 
         # Create document object
         document = Document(
             id=document_id,
             filename=filename,
-            content=content,
+            content=encoded_content,
             page_count=page_count,
-            character_count=len(content),
-            uploaded_at=datetime.utcnow()
+            character_count=character_count,
+            uploaded_at=datetime.utcnow(),
+            chunks=chunks,
+            bm25=retrieval_service.build_index(encoded_content, chunks),
+            content_hash=content_hash
         )
 
         # Store in dictionary
         self._documents[document_id] = document
+        if content_hash:
+            self._by_hash[content_hash] = document_id
 
         # Set as current document
-        self._current_document_id = document_id
+        self._current_document = document
 
         return document
 
@@ -111,6 +139,30 @@ class StorageService:
         """
         return self._documents.get(document_id)
 
+    def get_by_hash(self, content_hash: str) -> Optional[Document]:
+        """
+        Find a previously stored document by its uploaded file hash.
+
+        Args:
+            content_hash: Hash of the raw uploaded file
+
+        Returns:
+            Document if the same file was uploaded before, None otherwise
+        """
+        document_id = self._by_hash.get(content_hash)
+        if document_id is None:
+            return None
+        return self._documents.get(document_id)
+
+    def set_current_document(self, document: Document) -> None:
+        """
+        Make an already stored document the current one.
+
+        It also becomes the most recent document, as if just uploaded.
+        """
+        self._documents.move_to_end(document.id)
+        self._current_document = document
+
     def get_current_document(self) -> Optional[Document]:
         """
         Get the most recently uploaded document.
@@ -121,9 +173,7 @@ class StorageService:
         Returns:
             Current document or None if no documents uploaded
         """
-        if self._current_document_id:
-            return self._documents.get(self._current_document_id)
-        return None
+        return self._current_document
 
     def has_documents(self) -> bool:
         """Check if any documents have been uploaded."""
@@ -140,21 +190,24 @@ class StorageService:
             True if deleted, False if not found
         """
         if document_id in self._documents:
-            del self._documents[document_id]
+            document = self._documents.pop(document_id)
+            if document.content_hash:
+                self._by_hash.pop(document.content_hash, None)
+            # Drop any cached answers for this document
+            ai_service.clear_cache(document_id)
             # Update current document if we deleted it
-            if self._current_document_id == document_id:
+            if self._current_document is not None and self._current_document.id == document_id:
                 # Set to most recent remaining document or None
-                if self._documents:
-                    self._current_document_id = list(self._documents.keys())[-1]
-                else:
-                    self._current_document_id = None
+                self._current_document = next(reversed(self._documents.values()), None)
             return True
         return False
 
     def clear_all(self) -> None:
         """Clear all stored documents."""
         self._documents.clear()
-        self._current_document_id = None
+        self._by_hash.clear()
+        self._current_document = None
+        ai_service.clear_cache()
 
 
 # Create singleton instance